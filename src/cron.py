@@ -1,6 +1,11 @@
 import argparse
+import re
 import sys
-from typing import Literal
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Literal, cast
 
 type CRON_OPERATIONS = Literal[
     "all_items", "wild_card_with_step_value", "range", "list", "single_value"
@@ -8,194 +13,279 @@ type CRON_OPERATIONS = Literal[
 
 type CRON_TIME_PART = Literal["minute", "hour", "day_of_month", "month", "day_of_week"]
 
-MIN_VALUE: dict[CRON_TIME_PART, int] = {
-    "minute": 0,
-    "hour": 0,
-    "day_of_month": 1,
-    "month": 1,
-    "day_of_week": 1,
-}
-
-MAX_VALUE: dict[CRON_TIME_PART, int] = {
-    "minute": 59,
-    "hour": 23,
-    "day_of_month": 31,
-    "month": 12,
-    "day_of_week": 7,
-}
-
-CRON_PART: dict[int, CRON_TIME_PART] = {
-    0: "minute",
-    1: "hour",
-    2: "day_of_month",
-    3: "month",
-    4: "day_of_week",
-}
+# field bounds and names, indexed by the position of the field in the expression
+_NAME: tuple[CRON_TIME_PART, ...] = (
+    "minute",
+    "hour",
+    "day_of_month",
+    "month",
+    "day_of_week",
+)
+_MIN: tuple[int, ...] = (0, 0, 1, 1, 1)
+_MAX: tuple[int, ...] = (59, 23, 31, 12, 7)
+
+# string form of every value a field can hold, indexed by the value itself
+_INT_STR: tuple[str, ...] = tuple(str(i) for i in range(max(_MAX) + 1))
+
+# "*" always expands to the same values, so expand it once up front
+_ALL_ITEMS: tuple[tuple[int, ...], ...] = tuple(
+    tuple(range(minimum, maximum + 1)) for minimum, maximum in zip(_MIN, _MAX)
+)
+_ALL_ITEMS_STR: tuple[str, ...] = tuple(
+    " ".join([_INT_STR[i] for i in values]) for values in _ALL_ITEMS
+)
+
+# in-range single values as written, they print back unchanged
+_SINGLE_VALUE_STR: tuple[frozenset[str], ...] = tuple(
+    frozenset(_INT_STR[i] for i in values) for values in _ALL_ITEMS
+)
+
+# reverse of _INT_STR, lets the common one or two digit values skip int()
+_STR_INT: dict[str, int] = {s: i for i, s in enumerate(_INT_STR)}
+
+
+def _parse_small_int(value: str) -> int:
+
+    parsed = _STR_INT.get(value)
+
+    # leading zeros, signs and out of range values still go through int()
+    return int(value) if parsed is None else parsed
+
+
+# one bitmask per field, bit n is set when value n is part of the schedule
+@dataclass(frozen=True, slots=True)
+class CompiledCron:
+    minute: int
+    hour: int
+    day_of_month: int
+    month: int
+    day_of_week: int
+
+    def matches(self, dt: datetime) -> bool:
+        # day_of_week runs from 1 (Monday) to 7 (Sunday), same as isoweekday()
+        return bool(
+            (self.minute >> dt.minute)
+            & (self.hour >> dt.hour)
+            & (self.day_of_month >> dt.day)
+            & (self.month >> dt.month)
+            & (self.day_of_week >> dt.isoweekday())
+            & 1
+        )
+
+
+# each alternative is wrapped in a group named after its operation, so the
+# outermost matched group (lastgroup) is the operation itself
+_FIELD_RE = re.compile(
+    r"(?P<all_items>\*)"
+    r"|(?P<wild_card_with_step_value>\*/(?P<step>[0-9]+))"
+    r"|(?P<range>(?P<lo>[0-9]+)-(?P<hi>[0-9]+))"
+    r"|(?P<list>[0-9]+(?:,[0-9]+)+)"
+    r"|(?P<single_value>[0-9]+)"
+)
+
+
+def _match_field(field: str) -> re.Match[str]:
+
+    match = _FIELD_RE.fullmatch(field)
+
+    if match is None:
+        raise ValueError(f"Invalid operation: {field}")
+
+    return match
 
 
 def detect_operation(field: str) -> CRON_OPERATIONS:
+    return cast(CRON_OPERATIONS, _match_field(field).lastgroup)
 
-    operation = None
 
-    if field.startswith("*") and not field.startswith("*/"):
-        operation = "all_items"
+def _bounds_error(
+    part_idx: int,
+    operation: CRON_OPERATIONS,
+    minimum: int,
+    maximum: int,
+    subject: str = "value",
+) -> ValueError:
 
-    elif field.startswith("*/"):
-        operation = "wild_card_with_step_value"
+    # only reached on invalid input, keeps message formatting out of generate_mask
+    return ValueError(
+        f"For field '{_NAME[part_idx]}' with operation '{operation}', the {subject} must be between {minimum} and {maximum}"
+    )
 
-    elif "," in field:
-        operation = "list"
 
-    elif "-" in field:
-        operation = "range"
+def _range_mask(part_idx: int, lower_bound: int, upper_bound: int) -> int:
 
-    elif field.isdigit():
-        operation = "single_value"
+    if lower_bound > upper_bound:
+        raise ValueError(
+            f"For field '{_NAME[part_idx]}' with operation 'range', the lower value must be smaller or equal to the upper value"
+        )
 
-    else:
-        raise ValueError(f"Invalid operation: {field}")
+    minimum = _MIN[part_idx]
+    maximum = _MAX[part_idx]
 
-    return operation
+    if not minimum <= lower_bound <= maximum:
+        raise _bounds_error(part_idx, "range", minimum, maximum, "lower value")
 
+    if not minimum <= upper_bound <= maximum:
+        raise _bounds_error(part_idx, "range", minimum, maximum, "upper value")
 
-def validate_field(
-    cron_part_type: CRON_TIME_PART, operation: CRON_OPERATIONS, value: str | None = None
-) -> None:
+    return ((1 << (upper_bound - lower_bound + 1)) - 1) << lower_bound
 
-    if operation == "wild_card_with_step_value":
-        # assert for runtime safety and to satisfy the type checker
-        assert value is not None, "value is required for wild_card_with_step_value"
 
-        value_int = int(value)
+# value is the field's operand and may be omitted only for "all_items"
+def generate_mask(part_idx: int, operation: CRON_OPERATIONS, value: str = "") -> int:
 
-        if not (
-            value_int >= MIN_VALUE[cron_part_type]
-            and value_int <= MAX_VALUE[cron_part_type]
-        ):
-            raise ValueError(
-                f"For field '{cron_part_type}' with operation '{operation}', the value must be between {MIN_VALUE[cron_part_type] + 1} and {MAX_VALUE[cron_part_type]}"
-            )
+    minimum = _MIN[part_idx]
+    maximum = _MAX[part_idx]
 
-    elif operation == "range":
-        # assert for runtime safety and to satisfy the type checker
-        assert value is not None, "value is required for range"
+    if operation == "all_items":
+        mask = ((1 << (maximum - minimum + 1)) - 1) << minimum
 
-        # check for malformed range format
-        if value.startswith("-") or value.endswith("-") or value.count("-") != 1:
-            raise ValueError(
-                f"Malformed range format in field '{cron_part_type}' with operation '{operation}'"
-            )
+    elif operation == "wild_card_with_step_value":
+        value_int = _parse_small_int(value)
 
-        lower_bound, upper_bound = map(int, value.split("-"))
+        # a step of zero would never advance
+        if not 1 <= value_int <= maximum:
+            raise _bounds_error(part_idx, operation, 1, maximum)
 
-        if lower_bound > upper_bound:
-            raise ValueError(
-                f"For field '{cron_part_type}' with operation '{operation}', the lower value must be smaller or equal to the upper value"
-            )
+        mask = 0
+        for i in range(minimum, maximum + 1, value_int):
+            mask |= 1 << i
 
-        if not (
-            lower_bound >= MIN_VALUE[cron_part_type]
-            and lower_bound <= MAX_VALUE[cron_part_type]
-        ):
+    elif operation == "range":
+        # the field regex already rules this out, only direct callers can get here
+        if value.startswith("-") or value.endswith("-") or value.count("-") != 1:
             raise ValueError(
-                f"For field '{cron_part_type}' with operation '{operation}', the lower value must be between {MIN_VALUE[cron_part_type]} and {MAX_VALUE[cron_part_type]}"
+                f"Malformed range format in field '{_NAME[part_idx]}' with operation '{operation}'"
             )
 
-        if not (
-            upper_bound >= MIN_VALUE[cron_part_type]
-            and upper_bound <= MAX_VALUE[cron_part_type]
-        ):
-            raise ValueError(
-                f"For field '{cron_part_type}' with operation '{operation}', the upper value must be between {MIN_VALUE[cron_part_type]} and {MAX_VALUE[cron_part_type]}"
-            )
+        lower_bound, upper_bound = map(_parse_small_int, value.split("-"))
+        mask = _range_mask(part_idx, lower_bound, upper_bound)
 
     elif operation == "list":
-        # assert for runtime safety and to satisfy the type checker
-        assert value is not None, "value is required for list"
-
-        for i in map(int, value.split(",")):
-            if not (i >= MIN_VALUE[cron_part_type] and i <= MAX_VALUE[cron_part_type]):
-                raise ValueError(
-                    f"For field '{cron_part_type}' with operation '{operation}', the value must be between {MIN_VALUE[cron_part_type]} and {MAX_VALUE[cron_part_type]}"
-                )
+        mask = 0
+        for i in map(_parse_small_int, value.split(",")):
+            if not minimum <= i <= maximum:
+                raise _bounds_error(part_idx, operation, minimum, maximum)
+            mask |= 1 << i
 
     elif operation == "single_value":
-        # assert for runtime safety and to satisfy the type checker
-        assert value is not None, "value is required for single_value"
+        value_int = _parse_small_int(value)
 
-        value_int = int(value)
+        if not minimum <= value_int <= maximum:
+            raise _bounds_error(part_idx, operation, minimum, maximum)
 
-        if not (
-            value_int >= MIN_VALUE[cron_part_type]
-            and value_int <= MAX_VALUE[cron_part_type]
-        ):
-            raise ValueError(
-                f"For field '{cron_part_type}' with operation '{operation}', the value must be between {MIN_VALUE[cron_part_type]} and {MAX_VALUE[cron_part_type]}"
-            )
+        mask = 1 << value_int
 
+    return mask
 
-def generate_values(
-    cron_part_type: CRON_TIME_PART, operation: CRON_OPERATIONS, value: str | None = None
-) -> list[int]:
 
-    if operation == "all_items":
-        values = list(range(MIN_VALUE[cron_part_type], MAX_VALUE[cron_part_type] + 1))
+def mask_to_values(mask: int) -> array[int]:
 
-    elif operation == "wild_card_with_step_value":
-        # assert for runtime safety and to satisfy the type checker
-        assert value is not None, "value is required for wild_card_with_step_value"
-        values = list(
-            range(MIN_VALUE[cron_part_type], MAX_VALUE[cron_part_type] + 1, int(value))
-        )
+    # every cron value fits in a byte, so keep them unboxed
+    values = array("B")
 
-    elif operation == "range":
-        # assert for runtime safety and to satisfy the type checker
-        assert value is not None, "value is required for range"
-        lower_bound, upper_bound = map(int, value.split("-"))
-        values = list(range(lower_bound, upper_bound + 1))
+    while mask:
+        bit = mask & -mask
+        values.append(bit.bit_length() - 1)
+        mask ^= bit
 
-    elif operation == "list":
-        # assert for runtime safety and to satisfy the type checker
-        assert value is not None, "value is required for list"
-        values = [int(i) for i in value.split(",")]
+    return values
 
-    elif operation == "single_value":
-        # assert for runtime safety and to satisfy the type checker
-        assert value is not None, "value is required for single_value"
-        values = [int(value)]
 
-    return values
+def generate_values(
+    part_idx: int, operation: CRON_OPERATIONS, value: str = ""
+) -> array[int]:
 
+    if operation == "all_items":
+        return array("B", _ALL_ITEMS[part_idx])
 
-def process_cron_expression(expression: str) -> str:
+    return mask_to_values(generate_mask(part_idx, operation, value))
+
+
+def _split_expression(expression: str) -> list[str]:
 
     split_cron = expression.split()
 
     if len(split_cron) != 5:
         raise ValueError("Cron expression must contain 5 fields")
 
-    result: list[str] = []
+    return split_cron
+
+
+def _field_mask(part_idx: int, cron_field: str) -> int:
+
+    match = _match_field(cron_field)
+    operation = cast(CRON_OPERATIONS, match.lastgroup)
+
+    if operation == "all_items":
+        return generate_mask(part_idx, operation)
+
+    if operation == "wild_card_with_step_value":
+        return generate_mask(part_idx, operation, match["step"])
+
+    if operation == "range":
+        return _range_mask(
+            part_idx, _parse_small_int(match["lo"]), _parse_small_int(match["hi"])
+        )
+
+    return generate_mask(part_idx, operation, cron_field)
+
+
+def _field_masks(expression: str) -> list[int]:
+    return [
+        _field_mask(part_idx, cron_field)
+        for part_idx, cron_field in enumerate(_split_expression(expression))
+    ]
 
-    for i in range(len(split_cron)):
-        part = CRON_PART[i]
-        cron_field = split_cron[i]
 
-        operation = detect_operation(cron_field)
+# parse each distinct expression once, so per-tick callers only pay for matches()
+@lru_cache(maxsize=1024)
+def compile_cron_expression(expression: str) -> CompiledCron:
+    return CompiledCron(*_field_masks(expression))
 
-        if operation == "all_items":
-            val = generate_values(part, operation)
 
-        elif operation == "wild_card_with_step_value":
-            validate_field(part, operation, cron_field[2:])
-            val = generate_values(part, operation, cron_field[2:])
+def _emit_field(cron_field: str, part_idx: int, out: list[str]) -> None:
+
+    if cron_field == "*":
+        out.append(_ALL_ITEMS_STR[part_idx])
+        return
+
+    if cron_field in _SINGLE_VALUE_STR[part_idx]:
+        out.append(cron_field)
+        return
+
+    mask = _field_mask(part_idx, cron_field)
+
+    # walk the set bits from lowest to highest, each value followed by a separator
+    while mask:
+        bit = mask & -mask
+        out.append(_INT_STR[bit.bit_length() - 1])
+        out.append(" ")
+        mask ^= bit
+
+    # drop the separator after the last value
+    out.pop()
+
+
+# expressions are usually static configuration that gets re-evaluated, so
+# repeated calls with the same expression are served from the cache
+@lru_cache(maxsize=1024)
+def process_cron_expression(expression: str) -> str:
 
-        else:
-            validate_field(part, operation, cron_field)
-            val = generate_values(part, operation, cron_field)
+    minute, hour, day_of_month, month, day_of_week = _split_expression(expression)
 
-        result.append(f"{part:<14}{' '.join(map(str, val))}")
+    out: list[str] = ["minute        "]
+    _emit_field(minute, 0, out)
+    out.append("\nhour          ")
+    _emit_field(hour, 1, out)
+    out.append("\nday_of_month  ")
+    _emit_field(day_of_month, 2, out)
+    out.append("\nmonth         ")
+    _emit_field(month, 3, out)
+    out.append("\nday_of_week   ")
+    _emit_field(day_of_week, 4, out)
 
-    return "\n".join(result)
+    return "".join(out)
 
 
 if __name__ == "__main__":
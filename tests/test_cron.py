@@ -1,13 +1,16 @@
 import pytest
+import re
+from datetime import datetime
 from textwrap import dedent
 
 from src.cron import (
+    compile_cron_expression,
     detect_operation,
+    generate_mask,
     generate_values,
     process_cron_expression,
-    validate_field,
 )
-from src.cron import CRON_OPERATIONS, CRON_TIME_PART
+from src.cron import CRON_OPERATIONS
 
 
 class TestExceptions:
@@ -18,9 +21,15 @@ class TestExceptions:
         with pytest.raises(ValueError, match="Cron expression must contain 5 fields"):
             process_cron_expression(invalid_exp)
 
-    def test_invalid_operation(self) -> None:
+    def test_invalid_field_in_cron_expression(self) -> None:
 
-        invalid_field = "xyz"
+        invalid_exp = "*/10 * 10-20 2,5,12 x"
+
+        with pytest.raises(ValueError, match="Invalid operation: x"):
+            process_cron_expression(invalid_exp)
+
+    @pytest.mark.parametrize("invalid_field", ["xyz", "*5", "1-2-3", "1,", "-1"])
+    def test_invalid_operation(self, invalid_field: str) -> None:
 
         with pytest.raises(ValueError, match="Invalid operation"):
             detect_operation(invalid_field)
@@ -46,74 +55,137 @@ class TestOperationDetection:
 
 class TestValueGeneration:
     @pytest.mark.parametrize(
-        "cron_part, operation, value, expected",
+        "part_idx, operation, value, expected",
         [
-            ("month", "all_items", None, [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]),
-            ("minute", "wild_card_with_step_value", 15, [0, 15, 30, 45]),
-            ("day_of_week", "range", "1-5", [1, 2, 3, 4, 5]),
-            ("day_of_month", "list", "1,15", [1, 15]),
-            ("hour", "single_value", "0", [0]),
+            (3, "all_items", "", [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]),
+            (0, "wild_card_with_step_value", "15", [0, 15, 30, 45]),
+            (4, "range", "1-5", [1, 2, 3, 4, 5]),
+            (2, "list", "1,15", [1, 15]),
+            (1, "single_value", "0", [0]),
         ],
     )
     def test_generated_values(
         self,
-        cron_part: CRON_TIME_PART,
+        part_idx: int,
         operation: CRON_OPERATIONS,
-        value: str | None,
+        value: str,
         expected: list[int],
     ) -> None:
-        result = generate_values(cron_part, operation, value)
+        result = generate_values(part_idx, operation, value)
+        assert result.tolist() == expected
+
+
+class TestMaskGeneration:
+    @pytest.mark.parametrize(
+        "part_idx, operation, value, expected",
+        [
+            (4, "all_items", "", 0b11111110),
+            (1, "wild_card_with_step_value", "8", 0b1_0000_0001_0000_0001),
+            (3, "range", "2-4", 0b11100),
+            (0, "list", "0,3", 0b1001),
+            (2, "single_value", "5", 0b100000),
+        ],
+    )
+    def test_generated_mask(
+        self,
+        part_idx: int,
+        operation: CRON_OPERATIONS,
+        value: str,
+        expected: int,
+    ) -> None:
+        result = generate_mask(part_idx, operation, value)
         assert result == expected
 
 
 class TestFieldValidation:
     @pytest.mark.parametrize(
-        "cron_part, operation, value",
+        "part_idx, operation, value",
         [
-            ("minute", "wild_card_with_step_value", "15"),
-            ("day_of_week", "range", "1-5"),
-            ("day_of_month", "list", "1,15"),
-            ("hour", "single_value", "12"),
-            ("minute", "single_value", "0"),
+            (0, "wild_card_with_step_value", "15"),
+            (4, "range", "1-5"),
+            (2, "list", "1,15"),
+            (1, "single_value", "12"),
+            (0, "single_value", "0"),
         ],
     )
     def test_valid_fields(
         self,
-        cron_part: CRON_TIME_PART,
+        part_idx: int,
         operation: CRON_OPERATIONS,
         value: str,
     ) -> None:
         # Should not raise any exception for valid inputs
-        validate_field(cron_part, operation, value)
+        generate_mask(part_idx, operation, value)
 
     @pytest.mark.parametrize(
-        "cron_part, operation, value",
+        "part_idx, operation, value",
         [
-            ("minute", "wild_card_with_step_value", "-1"),
-            ("minute", "wild_card_with_step_value", "77"),
-            ("hour", "range", "-5-7"),
-            ("hour", "range", "-5-7-"),
-            ("day_of_week", "range", "-4"),
-            ("day_of_week", "range", "4-"),
-            ("day_of_week", "range", "6-2"),
-            ("day_of_week", "range", "6--2"),
-            ("month", "range", "10-20"),
-            ("month", "range", "15-25"),
-            ("day_of_month", "list", "15,35"),
-            ("day_of_month", "list", "-15,20"),
-            ("hour", "single_value", "-1"),
-            ("hour", "single_value", "60"),
-            ("month", "single_value", "-1"),
+            (0, "wild_card_with_step_value", "-1"),
+            (0, "wild_card_with_step_value", "77"),
+            (0, "wild_card_with_step_value", "0"),
+            (2, "wild_card_with_step_value", "0"),
+            (1, "range", "-5-7"),
+            (1, "range", "-5-7-"),
+            (4, "range", "-4"),
+            (4, "range", "4-"),
+            (4, "range", "6-2"),
+            (4, "range", "6--2"),
+            (3, "range", "10-20"),
+            (3, "range", "15-25"),
+            (2, "list", "15,35"),
+            (2, "list", "-15,20"),
+            (1, "single_value", "-1"),
+            (1, "single_value", "60"),
+            (3, "single_value", "-1"),
         ],
     )
     def test_invalid_fields(
         self,
-        cron_part: CRON_TIME_PART,
+        part_idx: int,
         operation: CRON_OPERATIONS,
         value: str,
     ) -> None:
         with pytest.raises(ValueError):
-            validate_field(cron_part, operation, value)
+            generate_mask(part_idx, operation, value)
+
+    @pytest.mark.parametrize(
+        "part_idx, operation, value, message",
+        [
+            (
+                0,
+                "wild_card_with_step_value",
+                "0",
+                "For field 'minute' with operation 'wild_card_with_step_value', the value must be between 1 and 59",
+            ),
+            (
+                3,
+                "range",
+                "0-5",
+                "For field 'month' with operation 'range', the lower value must be between 1 and 12",
+            ),
+            (
+                3,
+                "range",
+                "10-20",
+                "For field 'month' with operation 'range', the upper value must be between 1 and 12",
+            ),
+            (
+                1,
+                "list",
+                "1,24",
+                "For field 'hour' with operation 'list', the value must be between 0 and 23",
+            ),
+        ],
+    )
+    def test_out_of_bounds_messages(
+        self,
+        part_idx: int,
+        operation: CRON_OPERATIONS,
+        value: str,
+        message: str,
+    ) -> None:
+        with pytest.raises(ValueError, match=re.escape(message)):
+            generate_mask(part_idx, operation, value)
 
 
 class TestCronExpressionProcessing:
@@ -140,8 +212,66 @@ class TestCronExpressionProcessing:
                             day_of_week   4 5 6 7
                         """).strip(),
             ),
+            (
+                "0 0 15,1,15 * *",
+                dedent("""
+                            minute        0
+                            hour          0
+                            day_of_month  1 15
+                            month         1 2 3 4 5 6 7 8 9 10 11 12
+                            day_of_week   1 2 3 4 5 6 7
+                        """).strip(),
+            ),
+            (
+                "30 05 1 * 7",
+                dedent("""
+                            minute        30
+                            hour          5
+                            day_of_month  1
+                            month         1 2 3 4 5 6 7 8 9 10 11 12
+                            day_of_week   7
+                        """).strip(),
+            ),
         ],
     )
     def test_process_cron(self, cron_exp: str, expected: str) -> None:
         result = process_cron_expression(cron_exp)
         assert result == expected
+
+    def test_process_cron_single_value_out_of_range(self) -> None:
+
+        with pytest.raises(ValueError, match="the value must be between 0 and 23"):
+            process_cron_expression("0 24 * * *")
+
+    def test_process_cron_is_cached(self) -> None:
+        process_cron_expression.cache_clear()
+
+        first = process_cron_expression("0 12 * * 1-5")
+        second = process_cron_expression("0 12 * * 1-5")
+
+        assert first is second
+        assert process_cron_expression.cache_info().hits == 1
+
+
+class TestCompiledCron:
+    @pytest.mark.parametrize(
+        "cron_exp, dt, expected",
+        [
+            # 2026-07-15 is a Wednesday, 2026-08-15 a Saturday
+            ("*/15 0 1,15 * 1-5", datetime(2026, 7, 15, 0, 30), True),
+            ("*/15 0 1,15 * 1-5", datetime(2026, 7, 15, 0, 31), False),
+            ("*/15 0 1,15 * 1-5", datetime(2026, 7, 15, 1, 30), False),
+            ("*/15 0 1,15 * 1-5", datetime(2026, 7, 14, 0, 30), False),
+            ("*/15 0 1,15 * 1-5", datetime(2026, 8, 15, 0, 30), False),
+            ("* * * 2,5,12 *", datetime(2026, 12, 31, 23, 59), True),
+            ("* * * * 7", datetime(2026, 10, 18, 12, 0), True),
+        ],
+    )
+    def test_matches(self, cron_exp: str, dt: datetime, expected: bool) -> None:
+        compiled = compile_cron_expression(cron_exp)
+        assert compiled.matches(dt) == expected
+
+    def test_compile_is_cached(self) -> None:
+        assert compile_cron_expression("0 12 * * 1-5") is compile_cron_expression(
+            "0 12 * * 1-5"
+        )